@@ -21,7 +21,8 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
-config.set_main_option("sqlalchemy.url", get_sqlConnectionString())
+# ConfigParser treats % as interpolation, so escape the URL-encoded credentials
+config.set_main_option("sqlalchemy.url", get_sqlConnectionString().replace("%", "%%"))
 
 _db_connection_string = get_sqlConnectionString()
 
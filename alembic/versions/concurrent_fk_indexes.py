@@ -0,0 +1,52 @@
+"""concurrent fk indexes
+
+Revision ID: concurrent_fk_indexes
+Revises: hot_path_composite_indexes
+Create Date: 2025-03-20 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'concurrent_fk_indexes'
+down_revision = 'hot_path_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built after the tables are populated and without an ACCESS EXCLUSIVE
+    # lock; CONCURRENTLY cannot run inside a transaction block.
+    # refresh_tokens.user_id and items.user_id are covered by the
+    # (user_id, created_at) composites from hot_path_composite_indexes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_device_tokens_user_id'),
+            'device_tokens',
+            ['user_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            op.f('ix_oauth2_credentials_user_id'),
+            'oauth2_credentials',
+            ['user_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_oauth2_credentials_user_id'),
+            table_name='oauth2_credentials',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f('ix_device_tokens_user_id'),
+            table_name='device_tokens',
+            postgresql_concurrently=True,
+        )
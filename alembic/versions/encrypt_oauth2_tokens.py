@@ -0,0 +1,58 @@
+"""encrypt oauth2 tokens with pgcrypto
+
+Revision ID: encrypt_oauth2_tokens
+Revises: notification_recipients
+Create Date: 2025-03-21 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from env import get_settings
+
+# revision identifiers, used by Alembic.
+revision = 'encrypt_oauth2_tokens'
+down_revision = 'notification_recipients'
+branch_labels = None
+depends_on = None
+
+TOKEN_COLUMNS = ('access_token', 'refresh_token')
+
+
+def _token_key():
+    key = get_settings().oauth2_token_key
+    if key:
+        return key
+
+    # The key is only needed to convert existing tokens; an empty table (fresh
+    # database) can change column types without it
+    has_rows = op.get_bind().execute(
+        sa.text('SELECT EXISTS (SELECT 1 FROM oauth2_credentials)')
+    ).scalar()
+    if has_rows:
+        # pgp_sym_encrypt with a NULL key yields NULL and would wipe the tokens
+        raise RuntimeError("oauth2_token_key must be set to run this migration")
+    return ''
+
+
+def upgrade():
+    key = _token_key()
+    op.execute('CREATE EXTENSION IF NOT EXISTS pgcrypto')
+    for column in TOKEN_COLUMNS:
+        op.execute(
+            sa.text(
+                f'ALTER TABLE oauth2_credentials ALTER COLUMN {column} TYPE bytea '
+                f'USING pgp_sym_encrypt({column}, :key)'
+            ).bindparams(key=key)
+        )
+
+
+def downgrade():
+    key = _token_key()
+    for column in TOKEN_COLUMNS:
+        op.execute(
+            sa.text(
+                f'ALTER TABLE oauth2_credentials ALTER COLUMN {column} TYPE varchar '
+                f'USING pgp_sym_decrypt({column}, :key)'
+            ).bindparams(key=key)
+        )
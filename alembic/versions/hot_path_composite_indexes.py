@@ -0,0 +1,90 @@
+"""hot path composite indexes
+
+Revision ID: hot_path_composite_indexes
+Revises: initial_generic_schema
+Create Date: 2025-03-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'hot_path_composite_indexes'
+down_revision = 'initial_generic_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Per-user listings ordered by time
+        op.create_index(
+            'ix_items_user_id_created_at',
+            'items',
+            ['user_id', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_using='btree',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_refresh_tokens_user_id_created_at',
+            'refresh_tokens',
+            ['user_id', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_using='btree',
+            postgresql_concurrently=True,
+        )
+
+        # Scheduler poll for pending notifications
+        op.create_index(
+            'ix_notifications_unsent_created_at',
+            'notifications',
+            ['created_at'],
+            unique=False,
+            postgresql_where=sa.text('sent_status = false'),
+            postgresql_concurrently=True,
+        )
+
+        # The composites above lead with user_id, making these redundant
+        op.drop_index(
+            'ix_items_user_id', table_name='items', postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_refresh_tokens_user_id',
+            table_name='refresh_tokens',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_refresh_tokens_user_id',
+            'refresh_tokens',
+            ['user_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_items_user_id',
+            'items',
+            ['user_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_notifications_unsent_created_at',
+            table_name='notifications',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_refresh_tokens_user_id_created_at',
+            table_name='refresh_tokens',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_items_user_id_created_at',
+            table_name='items',
+            postgresql_concurrently=True,
+        )
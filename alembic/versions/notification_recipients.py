@@ -0,0 +1,68 @@
+"""notification recipients join table
+
+Revision ID: notification_recipients
+Revises: concurrent_fk_indexes
+Create Date: 2025-03-21 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'notification_recipients'
+down_revision = 'concurrent_fk_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notification_recipients',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('notification_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(
+            ['notification_id'], ['notifications.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('user_id', 'notification_id'),
+    )
+
+    # Backfill from the array column, skipping ids of users that no longer exist
+    op.execute(
+        """
+        INSERT INTO notification_recipients (user_id, notification_id)
+        SELECT DISTINCT r.user_id, n.id
+        FROM notifications n
+        CROSS JOIN LATERAL unnest(n.users) AS r(user_id)
+        JOIN users u ON u.id = r.user_id
+        """
+    )
+
+    op.drop_column('notifications', 'users')
+
+
+def downgrade():
+    op.add_column(
+        'notifications',
+        sa.Column(
+            'users',
+            sa.ARRAY(sa.Integer()),
+            nullable=False,
+            server_default=sa.text("'{}'"),
+        ),
+    )
+    op.execute(
+        """
+        UPDATE notifications n
+        SET users = r.users
+        FROM (
+            SELECT notification_id, array_agg(user_id ORDER BY user_id) AS users
+            FROM notification_recipients
+            GROUP BY notification_id
+        ) r
+        WHERE r.notification_id = n.id
+        """
+    )
+    op.alter_column('notifications', 'users', server_default=None)
+
+    op.drop_table('notification_recipients')
@@ -0,0 +1,161 @@
+"""partition notifications by month
+
+Revision ID: partition_notifications
+Revises: updated_at_triggers
+Create Date: 2025-03-25 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'partition_notifications'
+down_revision = 'updated_at_triggers'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the id sequence alive while the old table is dropped
+    op.execute('ALTER SEQUENCE notifications_id_seq OWNED BY NONE')
+    op.execute('ALTER TABLE notifications RENAME TO notifications_old')
+    op.execute(
+        'ALTER TABLE notification_recipients '
+        'DROP CONSTRAINT notification_recipients_notification_id_fkey'
+    )
+
+    # The partition key must be part of every unique constraint
+    op.execute(
+        """
+        CREATE TABLE notifications (
+            id integer NOT NULL DEFAULT nextval('notifications_id_seq'),
+            event varchar NOT NULL,
+            message varchar NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            sent_status boolean NOT NULL DEFAULT false,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute('ALTER SEQUENCE notifications_id_seq OWNED BY notifications.id')
+
+    # Monthly partitions (UTC boundaries); called by the scheduler ahead of time
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION ensure_notifications_partition(for_date timestamptz)
+        RETURNS void AS $$
+        DECLARE
+            month_start timestamp := date_trunc('month', for_date AT TIME ZONE 'UTC');
+            partition_name text := 'notifications_' || to_char(month_start, '"y"YYYY"m"MM');
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF notifications '
+                'FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                month_start AT TIME ZONE 'UTC',
+                (month_start + interval '1 month') AT TIME ZONE 'UTC'
+            );
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        SELECT ensure_notifications_partition(month)
+        FROM generate_series(
+            date_trunc('month', LEAST(
+                COALESCE((SELECT min(created_at) FROM notifications_old), now()),
+                now()
+            )),
+            now() + interval '1 month',
+            interval '1 month'
+        ) AS month
+        """
+    )
+    # Catch-all so inserts never fail if the scheduler falls behind
+    op.execute('CREATE TABLE notifications_default PARTITION OF notifications DEFAULT')
+
+    op.execute(
+        """
+        INSERT INTO notifications (id, event, message, created_at, sent_status)
+        SELECT id, event, message, created_at, sent_status FROM notifications_old
+        """
+    )
+    op.execute('DROP TABLE notifications_old')
+
+    # Created on the parent, so every partition gets a local copy
+    op.execute(
+        'CREATE INDEX ix_notifications_unsent_created_at '
+        'ON notifications (created_at) WHERE sent_status = false'
+    )
+
+    # Recipients reference the composite key
+    op.execute(
+        'ALTER TABLE notification_recipients ADD COLUMN notification_created_at timestamptz'
+    )
+    op.execute(
+        """
+        UPDATE notification_recipients r
+        SET notification_created_at = n.created_at
+        FROM notifications n
+        WHERE n.id = r.notification_id
+        """
+    )
+    op.execute(
+        'ALTER TABLE notification_recipients '
+        'ALTER COLUMN notification_created_at SET NOT NULL'
+    )
+    op.execute(
+        """
+        ALTER TABLE notification_recipients
+        ADD CONSTRAINT notification_recipients_notification_fkey
+        FOREIGN KEY (notification_id, notification_created_at)
+        REFERENCES notifications (id, created_at) ON DELETE CASCADE
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        'ALTER TABLE notification_recipients '
+        'DROP CONSTRAINT notification_recipients_notification_fkey'
+    )
+    op.execute(
+        'ALTER TABLE notification_recipients DROP COLUMN notification_created_at'
+    )
+
+    op.execute('ALTER SEQUENCE notifications_id_seq OWNED BY NONE')
+    op.execute('ALTER TABLE notifications RENAME TO notifications_partitioned')
+    op.execute(
+        """
+        CREATE TABLE notifications (
+            id integer NOT NULL DEFAULT nextval('notifications_id_seq'),
+            event varchar NOT NULL,
+            message varchar NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            sent_status boolean NOT NULL DEFAULT false,
+            PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO notifications (id, event, message, created_at, sent_status)
+        SELECT id, event, message, created_at, sent_status FROM notifications_partitioned
+        """
+    )
+    op.execute('DROP TABLE notifications_partitioned CASCADE')
+    op.execute('ALTER SEQUENCE notifications_id_seq OWNED BY notifications.id')
+    op.execute('DROP FUNCTION IF EXISTS ensure_notifications_partition(timestamptz)')
+
+    op.execute('CREATE INDEX ix_notifications_id ON notifications (id)')
+    op.execute(
+        'CREATE INDEX ix_notifications_unsent_created_at '
+        'ON notifications (created_at) WHERE sent_status = false'
+    )
+    op.execute(
+        """
+        ALTER TABLE notification_recipients
+        ADD CONSTRAINT notification_recipients_notification_id_fkey
+        FOREIGN KEY (notification_id) REFERENCES notifications (id) ON DELETE CASCADE
+        """
+    )
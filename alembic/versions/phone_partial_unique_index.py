@@ -0,0 +1,49 @@
+"""phone partial unique index
+
+Revision ID: phone_partial_unique_index
+Revises: partition_notifications
+Create Date: 2025-03-26 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'phone_partial_unique_index'
+down_revision = 'partition_notifications'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Unique among live accounts only; deleted rows keep their phone
+        op.create_index(
+            'ix_users_phone_active',
+            'users',
+            ['phone'],
+            unique=True,
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f('ix_users_phone'), table_name='users', postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    # Fails if a deleted account and a live one now share a phone number
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_users_phone'),
+            'users',
+            ['phone'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_users_phone_active',
+            table_name='users',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,63 @@
+"""maintain updated_at / last_used_at with triggers
+
+Revision ID: updated_at_triggers
+Revises: encrypt_oauth2_tokens
+Create Date: 2025-03-24 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'updated_at_triggers'
+down_revision = 'encrypt_oauth2_tokens'
+branch_labels = None
+depends_on = None
+
+UPDATED_AT_TABLES = ('device_tokens', 'oauth2_credentials', 'items')
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = now();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION set_last_used_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.last_used_at = now();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+    for table in UPDATED_AT_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_set_updated_at
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+            """
+        )
+    op.execute(
+        """
+        CREATE TRIGGER refresh_tokens_set_last_used_at
+        BEFORE UPDATE ON refresh_tokens
+        FOR EACH ROW EXECUTE FUNCTION set_last_used_at();
+        """
+    )
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS refresh_tokens_set_last_used_at ON refresh_tokens')
+    for table in UPDATED_AT_TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_set_updated_at ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS set_last_used_at()')
+    op.execute('DROP FUNCTION IF EXISTS set_updated_at()')
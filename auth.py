@@ -15,9 +15,11 @@ from env import get_settings
 from memcache import get_redis, get_cached_data, set_cached_data
 from models import User, RefreshToken
 
-SECRET_KEY = get_settings().auth_secret_key
-ALGORITHM = get_settings().auth_algorithm
-ACCESS_TOKEN_EXPIRE_MINUTES = get_settings().auth_access_token_expire_minutes
+SETTINGS = get_settings()
+
+SECRET_KEY = SETTINGS.auth_secret_key
+ALGORITHM = SETTINGS.auth_algorithm
+ACCESS_TOKEN_EXPIRE_MINUTES = SETTINGS.auth_access_token_expire_minutes
 REFRESH_TOKEN_EXPIRE_DAYS = 90  # 90 days for refresh token
 
 # OAuth2 scheme
@@ -63,7 +65,11 @@ def validate_jwt(token: str = Depends(oauth2_scheme)) -> str:
 
 
 def get_user(db, phone: str):
-    return db.query(User).filter(User.phone == phone).first()
+    return (
+        db.query(User)
+        .filter(User.phone == phone, User.is_deleted.is_(False))
+        .first()
+    )
 
 
 def get_user_by_id(db, user_id: int):
@@ -10,7 +10,7 @@ class KafkaConfig:
     auto_offset_reset: str = "earliest"
     enable_auto_commit: bool = True
     group_id: str = "fastapi_template_group"
-    api_version: tuple = (2, 5, 0)
+    api_version: str = "2.5.0"
 
 
 def get_default_config() -> KafkaConfig:
@@ -29,7 +29,7 @@ def get_default_config() -> KafkaConfig:
             auto_offset_reset="earliest",
             enable_auto_commit=True,
             group_id="fastapi_template_group",
-            api_version=(2, 5, 0),
+            api_version="2.5.0",
         )
     except Exception as e:
         logger.error(f"Error getting Kafka config: {str(e)}")
@@ -39,5 +39,5 @@ def get_default_config() -> KafkaConfig:
             auto_offset_reset="earliest",
             enable_auto_commit=True,
             group_id="fastapi_template_group",
-            api_version=(2, 5, 0),
+            api_version="2.5.0",
         )
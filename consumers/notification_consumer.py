@@ -1,23 +1,42 @@
 import asyncio
-from datetime import datetime, timedelta
+import threading
+
 from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy import text
 from sqlalchemy.orm import Session
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import undefer
 
 from db import SessionLocal
-from models import Notification
+from models import Notification, User, notification_recipients
+
+# The scheduler and the Kafka consumer both run this off the event loop; only
+# one pass at a time so a notification is never picked up twice
+_PROCESS_LOCK = threading.Lock()
 
 
-async def process_notifications():
+def process_notifications():
     """
     Process pending notifications.
     This is a generic implementation that can be customized based on your needs.
+    Blocking; call it from a worker thread, not the event loop.
     """
+    with _PROCESS_LOCK:
+        _process_pending_notifications()
+
+
+def _process_pending_notifications():
     try:
         db = SessionLocal()
         try:
             # Get unsent notifications
             notifications = (
                 db.query(Notification)
+                .options(
+                    undefer(Notification.message),
+                    selectinload(Notification.recipients).load_only(User.id),
+                )
                 .filter(Notification.sent_status == False)  # noqa
                 .order_by(Notification.created_at.asc())
                 .limit(100)
@@ -37,8 +56,9 @@ async def process_notifications():
                     # For example, sending push notifications, emails, etc.
                     
                     # This is a placeholder for actual notification delivery
+                    user_ids = [user.id for user in notification.recipients]
                     logger.info(
-                        f"Sending notification {notification.id} to users {notification.users}: "
+                        f"Sending notification {notification.id} to users {user_ids}: "
                         f"{notification.event} - {notification.message}"
                     )
                     
@@ -62,22 +82,58 @@ async def process_notifications():
         logger.error(f"Critical error in notification processing: {str(e)}")
 
 
+def ensure_notification_partitions():
+    """
+    Create the current and next month's notifications partitions if missing.
+    Run ahead of time so new rows don't pile up in the default partition.
+    Blocking; call it from a worker thread, not the event loop.
+    """
+    try:
+        db = SessionLocal()
+        try:
+            db.execute(
+                text(
+                    "SELECT ensure_notifications_partition(now()), "
+                    "ensure_notifications_partition(now() + interval '1 month')"
+                )
+            )
+            db.commit()
+            logger.debug("Notification partitions are up to date")
+        except Exception as e:
+            logger.error(f"Error creating notification partitions: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Critical error creating notification partitions: {str(e)}")
+
+
 async def send_notification_to_user(user_id: int, event: str, message: str):
     """
     Helper function to send a notification to a specific user.
     This can be called from other services.
     """
+    return await asyncio.to_thread(_create_notification, user_id, event, message)
+
+
+def _create_notification(user_id: int, event: str, message: str):
     try:
         db = SessionLocal()
         try:
             notification = Notification(
-                users=[user_id],
                 event=event,
                 message=message,
-                created_at=datetime.utcnow(),
                 sent_status=False,
             )
             db.add(notification)
+            db.flush()
+            db.execute(
+                insert(notification_recipients).values(
+                    user_id=user_id,
+                    notification_id=notification.id,
+                    notification_created_at=notification.created_at,
+                )
+            )
             db.commit()
             logger.debug(f"Created notification for user {user_id}: {event} - {message}")
             return notification
@@ -94,4 +150,4 @@ async def send_notification_to_user(user_id: int, event: str, message: str):
 
 if __name__ == "__main__":
     # For testing
-    asyncio.run(process_notifications())
+    process_notifications()
@@ -14,6 +14,10 @@ engine = create_engine(
     pool_timeout=60,  # Increased from default 30
     pool_recycle=3600,  # Recycle connections after 1 hour
     pool_pre_ping=True,  # Enable connection health checks
+    # Batch executemany() round trips: multi-row INSERT ... VALUES for inserts,
+    # psycopg2 execute_batch for UPDATE/DELETE
+    executemany_mode="values_plus_batch",
+    insertmanyvalues_page_size=1000,
 )
 
 # Production session
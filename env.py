@@ -1,6 +1,8 @@
 import os
 import re
+import sys
 from functools import lru_cache
+from urllib.parse import quote_plus
 
 from loguru import logger
 from pydantic_settings import BaseSettings
@@ -73,6 +75,15 @@ class Settings(BaseSettings):
     google_client_secret: str | None = None
     google_pubsub_topic: str | None = None
 
+    # Serve GET /users/me from access token claims instead of the database.
+    # Off by default: profile edits and deletions reach the claims path only
+    # through Redis, so a lost or evicted key serves them stale until the
+    # token expires.
+    me_from_token_claims: bool = False
+
+    # Symmetric key for pgcrypto-encrypted OAuth2 tokens
+    oauth2_token_key: str | None = None
+
     app_env: str = APP_ENV
 
 
@@ -81,19 +92,27 @@ def get_settings():
     return Settings()
 
 
+def reload_settings():
+    """
+    Re-read settings and rebind every module-level SETTINGS that held the old
+    instance. Values copied out at import time (auth's SECRET_KEY, the Twilio
+    client, the database engine) are not rebuilt.
+    """
+    previous = get_settings()
+    get_settings.cache_clear()
+    get_sqlConnectionString.cache_clear()
+    settings = get_settings()
+    for module in list(sys.modules.values()):
+        if getattr(module, "SETTINGS", None) is previous:
+            module.SETTINGS = settings
+    return settings
+
+
+@lru_cache(maxsize=1)
 def get_sqlConnectionString():
     settings = get_settings()
-    connection = (
-        "postgresql://"
-        + settings.sql_user
-        + ":"
-        + settings.sql_password
-        + "@"
-        + settings.sql_host
-        + ":"
-        + settings.sql_port
-        + "/"
-        + settings.sql_database
+    # Escape credentials so characters like @ or / don't break the URL
+    return (
+        f"postgresql://{quote_plus(settings.sql_user)}:{quote_plus(settings.sql_password)}"
+        f"@{settings.sql_host}:{settings.sql_port}/{settings.sql_database}"
     )
-    logger.debug(f"Connection string: {connection}")
-    return connection
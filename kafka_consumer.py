@@ -1,194 +1,198 @@
-import json
-from dataclasses import dataclass
-from datetime import datetime
-from threading import Thread
 import asyncio
 from typing import Any, Dict, List, Optional
+import orjson
 from loguru import logger
-from kafka import KafkaConsumer
-from consumers.kafka_config import get_default_config
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import ValidationError
+from aiokafka import AIOKafkaConsumer
+from aiokafka.errors import KafkaError
+from aiokafka.structs import ConsumerRecord
+from tenacity import RetryCallState
+from tenacity import retry
+from tenacity import retry_if_exception_type
+from tenacity import stop_after_attempt
+from tenacity import wait_exponential_jitter
+from consumers.kafka_config import KafkaConfig, get_default_config
 from consumers.notification_consumer import process_notifications
 
 
-@dataclass(frozen=True)
-class Message:
-    topic: str
-    value: Dict[str, Any]
+async def _connect(topics: list[str], kafka_config: KafkaConfig) -> AIOKafkaConsumer:
+    """Create a Kafka consumer and connect it to the cluster"""
+    logger.debug(f"Attempting to create Kafka consumer for topics: {topics}")
+    consumer = AIOKafkaConsumer(
+        *topics,
+        bootstrap_servers=kafka_config.bootstrap_servers,
+        value_deserializer=orjson.loads,
+        auto_offset_reset=kafka_config.auto_offset_reset,
+        enable_auto_commit=kafka_config.enable_auto_commit,
+        group_id=kafka_config.group_id,
+        api_version=kafka_config.api_version,
+        # Add connection timeout to prevent hanging
+        session_timeout_ms=6000,
+        request_timeout_ms=10000,
+    )
+    try:
+        await consumer.start()
+    except KafkaError:
+        await consumer.stop()
+        raise
+    return consumer
 
 
-def create_kafka_consumer(
-    topics: list[str], config: Optional[dict] = None, max_retries: int = 5
-) -> Optional[KafkaConsumer]:
+async def create_kafka_consumer(
+    topics: list[str], config: Optional[KafkaConfig] = None, max_retries: int = 5
+) -> Optional[AIOKafkaConsumer]:
     """Create a Kafka consumer for the specified topics with retry mechanism"""
     kafka_config = config or get_default_config()
-    retry_count = 0
-    while retry_count < max_retries:
-        try:
-            logger.debug(
-                f"Attempting to create Kafka consumer for topics: {topics} (attempt {retry_count + 1}/{max_retries})"
-            )
-            consumer = KafkaConsumer(
-                *topics,
-                bootstrap_servers=kafka_config.bootstrap_servers,
-                value_deserializer=lambda m: json.loads(m.decode("utf-8")),
-                auto_offset_reset=kafka_config.auto_offset_reset,
-                enable_auto_commit=kafka_config.enable_auto_commit,
-                group_id=kafka_config.group_id,
-                api_version=kafka_config.api_version,
-                # Add connection timeout to prevent hanging
-                session_timeout_ms=6000,
-                request_timeout_ms=10000,
-            )
-            # Test the connection
-            consumer.topics()
-            logger.info("Successfully created Kafka consumer")
-            return consumer
-        except Exception as e:
-            retry_count += 1
-            if retry_count == max_retries:
-                logger.error(
-                    f"Failed to create Kafka consumer after {max_retries} attempts: {str(e)}"
-                )
-                return None
-            wait_time = min(
-                2**retry_count, 30
-            )  # Exponential backoff capped at 30 seconds
-            logger.warning(
-                f"Failed to create Kafka consumer (attempt {retry_count}/{max_retries}). Retrying in {wait_time} seconds..."
-            )
-            import time
 
-            time.sleep(wait_time)
+    def log_retry(retry_state: RetryCallState) -> None:
+        logger.warning(
+            f"Failed to create Kafka consumer (attempt {retry_state.attempt_number}/{max_retries}). "
+            f"Retrying in {retry_state.next_action.sleep:.1f} seconds..."
+        )
+
+    # Jittered exponential backoff capped at 30 seconds; only broker errors are
+    # retried so configuration mistakes fail fast
+    connect = retry(
+        retry=retry_if_exception_type(KafkaError),
+        wait=wait_exponential_jitter(max=30),
+        stop=stop_after_attempt(max_retries),
+        before_sleep=log_retry,
+        reraise=True,
+    )(_connect)
+
+    try:
+        consumer = await connect(topics, kafka_config)
+    except KafkaError as e:
+        logger.error(
+            f"Failed to create Kafka consumer after {max_retries} attempts: {str(e)}"
+        )
+        return None
+
+    logger.info("Successfully created Kafka consumer")
+    return consumer
+
+
+class NotificationPayload(BaseModel):
+    user_id: int
+    event: str = Field(min_length=1)
+    content: str = Field(min_length=1)
+
+    model_config = {"frozen": True, "extra": "ignore"}
 
 
-async def process_message_batch(messages: List[Message]) -> None:
+async def _handle_notification(value: Dict[str, Any]) -> None:
+    """Process notification messages"""
+    try:
+        NotificationPayload.model_validate(value)
+    except ValidationError as e:
+        logger.error(f"Invalid notification message: {str(e)}")
+        return
+
+    # Call your notification processor here; it does blocking DB work, so run
+    # it in a thread to keep fetches and heartbeats flowing
+    await asyncio.to_thread(process_notifications)
+
+
+async def _handle_generic(value: Dict[str, Any]) -> None:
+    """Process generic topic messages"""
+    # Implement your generic topic handler here
+    logger.debug(f"Processing generic topic message: {value}")
+
+
+# Topic -> handler routing table. Add more topic handlers here as needed.
+HANDLERS = {
+    "notifications": _handle_notification,
+    "generic_topic": _handle_generic,
+}
+
+
+async def process_message_batch(records: List[ConsumerRecord]) -> None:
     """Route messages to appropriate processors"""
-    for message in messages:
+    for record in records:
         try:
-            logger.debug(f"Processing message from batch: {message.topic} - {message.value}")
-
-            # Example message routing based on topic
-            if message.topic == "notifications":
-                # Process notification messages
-                user_id = message.value.get("user_id")
-                event = message.value.get("event")
-                content = message.value.get("content")
-                
-                if all([user_id, event, content]):
-                    # Call your notification processor here
-                    await process_notifications()
-                else:
-                    logger.error("Missing required fields in notification message")
-                continue
-                
-            # Add more topic handlers here as needed
-            if message.topic == "generic_topic":
-                # Process generic topic messages
-                # Implement your generic topic handler here
-                logger.debug(f"Processing generic topic message: {message.value}")
+            logger.debug(f"Processing message from batch: {record.topic} - {record.value}")
+
+            handler = HANDLERS.get(record.topic)
+            if handler is None:
+                # Default case for unhandled topics
+                logger.warning(f"Unhandled message topic: {record.topic}")
                 continue
 
-            # Default case for unhandled topics
-            logger.warning(f"Unhandled message topic: {message.topic}")
+            await handler(record.value)
 
         except Exception as e:
             logger.error(f"Error processing message in batch: {str(e)}")
             continue
 
 
-async def consume_messages(consumer: KafkaConsumer) -> None:
-    """Consume and batch process messages from Kafka"""
+async def consume_messages(consumer: AIOKafkaConsumer) -> None:
+    """Consume and batch process messages from Kafka until cancelled"""
     if not consumer:
         logger.error("No consumer provided")
         return
 
-    # Wait for initial connection
-    try:
-        consumer.topics()
-        logger.debug("Initial Kafka connection successful")
-    except Exception as e:
-        logger.error(f"Failed to establish initial Kafka connection: {str(e)}")
-        return
-
     BATCH_SIZE = 25  # Process messages in smaller batches
     BATCH_TIMEOUT = 5  # Wait up to 5 seconds to collect messages
 
     logger.debug("Starting to consume messages")
-    while True:
-        try:
-            # Poll for a batch of messages
-            message_batch = []
-            start_time = datetime.now()
-
-            while (
-                len(message_batch) < BATCH_SIZE
-                and (datetime.now() - start_time).seconds < BATCH_TIMEOUT
-            ):
-                messages = consumer.poll(timeout_ms=1000)
-                if not messages:
-                    continue
-
-                for topic_partition, records in messages.items():
-                    for record in records:
-                        message_batch.append(
-                            Message(topic=record.topic, value=record.value)
-                        )
-                        if len(message_batch) >= BATCH_SIZE:
-                            break
-                    if len(message_batch) >= BATCH_SIZE:
-                        break
-
-            if not message_batch:
-                await asyncio.sleep(1)  # Prevent tight polling loop
-                continue
-
-            # Process the batch of messages
-            await process_message_batch(message_batch)
-            logger.debug(f"Successfully processed batch of {len(message_batch)} messages")
+    try:
+        while True:
+            try:
+                # Fetch a batch of messages in a single call
+                records = await consumer.getmany(
+                    timeout_ms=BATCH_TIMEOUT * 1000, max_records=BATCH_SIZE
+                )
+                message_batch = [
+                    record
+                    for partition_records in records.values()
+                    for record in partition_records
+                ]
 
-        except Exception as e:
-            logger.error(f"Consumer error: {str(e)}")
-            await asyncio.sleep(1)  # Prevent tight error loop
-            continue
+                if not message_batch:
+                    continue  # getmany() already waited for up to BATCH_TIMEOUT
 
+                # Process the batch of messages
+                await process_message_batch(message_batch)
+                logger.debug(f"Successfully processed batch of {len(message_batch)} messages")
 
-def start_kafka_consumer() -> Optional[Thread]:
-    """Start a Kafka consumer in a separate thread"""
+            except Exception as e:
+                logger.error(f"Consumer error: {str(e)}")
+                await asyncio.sleep(1)  # Prevent tight error loop
+                continue
+    finally:
+        await consumer.stop()
+        logger.debug("Kafka consumer stopped")
+
+
+async def run_kafka_consumer() -> None:
+    """Create a Kafka consumer and consume until cancelled"""
+    logger.debug("Starting Kafka consumer")
+    consumer = await create_kafka_consumer(
+        [
+            "notifications",
+            "generic_topic",
+            # Add more topics as needed
+        ]
+    )
+    if not consumer:
+        logger.error("Failed to create consumer")
+        return
 
-    def run_consumer():
-        try:
-            # Create new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            logger.debug("Starting Kafka consumer")
-            consumer = create_kafka_consumer(
-                [
-                    "notifications",
-                    "generic_topic",
-                    # Add more topics as needed
-                ]
-            )
-            if not consumer:
-                logger.error("Failed to create consumer")
-                return
+    await consume_messages(consumer)
 
-            try:
-                loop.run_until_complete(consume_messages(consumer))
-            finally:
-                loop.close()
-        except Exception as e:
-            logger.error(f"Error in consumer thread: {str(e)}")
 
+def start_kafka_consumer() -> Optional[asyncio.Task]:
+    """Start a Kafka consumer as a task on the running event loop"""
     try:
-        consumer_thread = Thread(target=run_consumer, daemon=True)
-        consumer_thread.start()
-        logger.debug("Kafka consumer thread started")
-        return consumer_thread
+        consumer_task = asyncio.create_task(run_kafka_consumer())
+        logger.debug("Kafka consumer task started")
+        return consumer_task
     except Exception as e:
-        logger.error(f"Failed to start consumer thread: {str(e)}")
+        logger.error(f"Failed to start consumer task: {str(e)}")
         return None
 
 
 if __name__ == "__main__":
-    start_kafka_consumer()
+    asyncio.run(run_kafka_consumer())
@@ -1,6 +1,8 @@
 import json
 from functools import lru_cache
 from typing import Any
+from typing import Dict
+from typing import List
 from typing import Optional
 
 from loguru import logger
@@ -83,3 +85,88 @@ def set_cached_data(key: str, data: Any, expire_seconds: int = 3600) -> bool:
     except Exception as e:
         logger.error(f"Unexpected error during cache set: {str(e)}")
         return False
+
+
+def try_get_cached_many(keys: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Get several keys from Redis cache in a single MGET round trip.
+    Returns a dict of the keys that were found, or None if Redis could not be
+    read, so callers can tell a failed lookup from a miss.
+    """
+    if not keys:
+        return {}
+    try:
+        redis = get_redis()
+        if not redis:
+            return None
+
+        values = redis.mget(keys)
+        return {key: json.loads(value) for key, value in zip(keys, values) if value}
+    except (ConnectionError, TimeoutError) as e:
+        logger.warning(f"Redis mget operation failed: {str(e)}")
+        return None
+    except RedisError as e:
+        logger.error(f"Redis error during mget: {str(e)}")
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error during cache mget: {str(e)}")
+        return None
+
+
+def get_cached_many(keys: List[str]) -> Dict[str, Any]:
+    """
+    Get several keys from Redis cache in a single MGET round trip.
+    Returns a dict of the keys that were found; empty if Redis is unavailable.
+    """
+    return try_get_cached_many(keys) or {}
+
+
+def set_cached_many(mapping: Dict[str, Any], expire_seconds: int = 3600) -> bool:
+    """
+    Set several keys in Redis cache with one pipelined round trip.
+    Returns True if successful, False otherwise.
+    """
+    if not mapping:
+        return True
+    try:
+        redis = get_redis()
+        if not redis:
+            return False
+
+        pipe = redis.pipeline(transaction=False)
+        for key, data in mapping.items():
+            pipe.setex(name=key, time=expire_seconds, value=json.dumps(data))
+        pipe.execute()
+        return True
+    except (ConnectionError, TimeoutError) as e:
+        logger.warning(f"Redis pipelined set operation failed: {str(e)}")
+        return False
+    except RedisError as e:
+        logger.error(f"Redis error during pipelined set: {str(e)}")
+        return False
+    except Exception as e:
+        logger.error(f"Unexpected error during cache set_many: {str(e)}")
+        return False
+
+
+def delete_cached_data(key: str) -> bool:
+    """
+    Delete a key from Redis cache with graceful error handling.
+    Returns True if successful, False otherwise.
+    """
+    try:
+        redis = get_redis()
+        if not redis:
+            return False
+
+        redis.delete(key)
+        return True
+    except (ConnectionError, TimeoutError) as e:
+        logger.warning(f"Redis delete operation failed: {str(e)}")
+        return False
+    except RedisError as e:
+        logger.error(f"Redis error during delete: {str(e)}")
+        return False
+    except Exception as e:
+        logger.error(f"Unexpected error during cache delete: {str(e)}")
+        return False
@@ -2,17 +2,28 @@ import enum
 from datetime import datetime
 
 from pydantic import BaseModel
-from sqlalchemy import ARRAY, Boolean, Column, Date, DateTime, Enum, ForeignKey
-from sqlalchemy import Integer, String, Text, JSON
+from sqlalchemy import Boolean, Column, Date, DateTime, Enum, ForeignKey, Index
+from sqlalchemy import DDL, ForeignKeyConstraint, event
+from sqlalchemy import Integer, LargeBinary, String, Table, Text, JSON
+from sqlalchemy import FetchedValue, literal, type_coerce
+from sqlalchemy.orm import deferred
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 
 from db import Base
+from env import get_settings
+
+SETTINGS = get_settings()
 
 ###
 # Users
 ###
 
+# Timestamps are generated by Postgres: created_at via DEFAULT now(), and
+# updated_at / last_used_at via BEFORE UPDATE triggers (see the
+# updated_at_triggers migration). FetchedValue tells the ORM to expire them.
+
 
 # Alchemy models
 class User(Base):
@@ -22,7 +33,7 @@ class User(Base):
     last_name = Column(String)
     email = Column(String, unique=True, index=True, nullable=True)
     email_verified = Column(Boolean, default=False)
-    phone = Column(String, unique=True, index=True, nullable=True)
+    phone = Column(String, nullable=True)
     phone_verified = Column(Boolean, default=False)
     picture = Column(String, unique=False, nullable=True)
     password_hash = Column(String, nullable=True)
@@ -34,26 +45,52 @@ class User(Base):
     deleted_at = Column(DateTime(timezone=True), nullable=True)  # Soft delete timestamp
     is_deleted = Column(Boolean, default=False)  # Flag to mark user as deleted
 
+    # Children are lazy by default since a User is loaded on every authed
+    # request; use selectinload()/joinedload() per query when iterating them.
+    device_tokens = relationship(
+        "DeviceToken", back_populates="user", passive_deletes=True
+    )
+    refresh_tokens = relationship(
+        "RefreshToken", back_populates="user", passive_deletes=True
+    )
+    oauth2_credentials = relationship(
+        "OAuth2Credentials", back_populates="user", passive_deletes=True
+    )
+    items = relationship("Item", back_populates="user", passive_deletes=True)
+
+    __table_args__ = (
+        # Phones are unique among live accounts only, so a deleted account's
+        # number can be reused and tombstones stay out of the lookup index
+        Index(
+            "ix_users_phone_active",
+            phone,
+            unique=True,
+            postgresql_where=(is_deleted == False),  # noqa
+        ),
+    )
+
 
 class DeviceToken(Base):
     __tablename__ = "device_tokens"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
-        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
     token = Column(String, nullable=False, unique=True, index=True)
     device_type = Column(String, nullable=False)  # "ios" or "android"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue()
     )
 
+    user = relationship("User", back_populates="device_tokens")
+
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
-        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     token = Column(String, nullable=False, unique=True, index=True)
     device_info = Column(String, nullable=True)  # Store device fingerprint info
@@ -61,7 +98,13 @@ class RefreshToken(Base):
     is_revoked = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_used_at = Column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue()
+    )
+
+    user = relationship("User", back_populates="refresh_tokens")
+
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_id_created_at", user_id, created_at.desc()),
     )
 
 
@@ -70,15 +113,61 @@ class RefreshToken(Base):
 ###
 
 
+# Keyed (user_id, notification_id) so per-user lookups are a B-tree range scan
+notification_recipients = Table(
+    "notification_recipients",
+    Base.metadata,
+    Column(
+        "user_id",
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("notification_id", Integer, primary_key=True),
+    # Part of the notifications key since that table is partitioned on it
+    Column("notification_created_at", DateTime(timezone=True), nullable=False),
+    ForeignKeyConstraint(
+        ["notification_id", "notification_created_at"],
+        ["notifications.id", "notifications.created_at"],
+        ondelete="CASCADE",
+    ),
+)
+
+
 class Notification(Base):
     __tablename__ = "notifications"
-    id = Column(Integer, primary_key=True, index=True)
-    users = Column(ARRAY(Integer), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     event = Column(String, nullable=False)
-    message = Column(String, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    message = deferred(Column(String, nullable=False))
+    # Monthly range partition key; partitions are created by
+    # ensure_notifications_partition() (see the partition_notifications migration)
+    created_at = Column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
+    )
     sent_status = Column(Boolean, default=False)
 
+    recipients = relationship(
+        "User", secondary=notification_recipients, passive_deletes=True
+    )
+
+    __table_args__ = (
+        # Partial index for the scheduler's pending-notification poll
+        Index(
+            "ix_notifications_unsent_created_at",
+            created_at,
+            postgresql_where=(sent_status == False),  # noqa
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+# Tables built by create_all() rather than migrations still accept inserts
+event.listen(
+    Notification.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS notifications_default PARTITION OF notifications DEFAULT"),
+)
+
 
 ###
 # OAuth2 Credentials
@@ -91,22 +180,44 @@ class OAuth2Provider(str, enum.Enum):
     FACEBOOK = "facebook"
 
 
+def _oauth2_token_key():
+    key = SETTINGS.oauth2_token_key
+    if not key:
+        raise RuntimeError("oauth2_token_key must be set to read or write OAuth2 tokens")
+    return literal(key, String)
+
+
+class PGPEncryptedString(TypeDecorator):
+    """String stored as BYTEA, encrypted/decrypted in Postgres with pgcrypto"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def bind_expression(self, bindvalue):
+        return func.pgp_sym_encrypt(type_coerce(bindvalue, String), _oauth2_token_key())
+
+    def column_expression(self, column):
+        return func.pgp_sym_decrypt(column, _oauth2_token_key(), type_=String)
+
+
 class OAuth2Credentials(Base):
     __tablename__ = "oauth2_credentials"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
-        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
     provider = Column(Enum(OAuth2Provider), nullable=False)
     email = Column(String, nullable=False, index=True)
-    access_token = Column(String, nullable=True)
-    refresh_token = Column(String, nullable=True)
+    access_token = deferred(Column(PGPEncryptedString, nullable=True), group="tokens")
+    refresh_token = deferred(Column(PGPEncryptedString, nullable=True), group="tokens")
     token_expiry = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue()
     )
 
+    user = relationship("User", back_populates="oauth2_credentials")
+
 
 ###
 # Generic Item (Example Model)
@@ -117,15 +228,21 @@ class Item(Base):
     __tablename__ = "items"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
-        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     title = Column(String, nullable=False, index=True)
-    description = Column(Text, nullable=True)
-    data = Column(JSON, nullable=True)
+    description = deferred(Column(Text, nullable=True), group="content")
+    data = deferred(Column(JSON, nullable=True), group="content")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue()
+    )
+
+    user = relationship("User", back_populates="items")
+
+    __table_args__ = (
+        Index("ix_items_user_id_created_at", user_id, created_at.desc()),
     )
 
 
@@ -193,6 +310,18 @@ class ItemResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ItemSummary(BaseModel):
+    """List view of an item; leaves out the deferred description and data"""
+
+    id: int
+    title: str
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
 class ItemUpdate(BaseModel):
     title: str = None
     description: str = None
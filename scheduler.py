@@ -1,7 +1,8 @@
-import time
-import schedule
 import asyncio
+from datetime import datetime
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from loguru import logger
+from consumers.notification_consumer import ensure_notification_partitions
 from consumers.notification_consumer import process_notifications
 from kafka_consumer import start_kafka_consumer
 
@@ -12,26 +13,26 @@ class ServiceScheduler:
     def __init__(self):
         self.notification_enabled = True
         self.kafka_enabled = True
-        self.kafka_thread = None  # Initialize as None since it will hold the actual thread
+        self.kafka_task = None  # Holds the consumer task while Kafka is enabled
         self.task1_enabled = True  # Example generic task
         self.task2_enabled = True  # Example generic task
+        # Coalesce missed runs and never overlap a job with itself
+        self._scheduler = AsyncIOScheduler(
+            job_defaults={"coalesce": True, "max_instances": 1}
+        )
 
     def run_process_notifications(self):
-        """Sync wrapper for async process_notifications"""
+        """Process pending notifications if enabled"""
         if not self.notification_enabled:
             logger.debug("Notification processing is disabled")
             return
 
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(process_notifications())
+            process_notifications()
         except Exception as e:
             logger.error(f"Error in notification processing: {str(e)}")
-        finally:
-            loop.close()
 
-    def run_task1(self):
+    async def run_task1(self):
         """Run generic task 1 if enabled"""
         if not self.task1_enabled:
             logger.debug("Task 1 processing is disabled")
@@ -44,7 +45,7 @@ class ServiceScheduler:
         except Exception as e:
             logger.error(f"Error in task 1 processing: {str(e)}")
 
-    def run_task2(self):
+    async def run_task2(self):
         """Run generic task 2 if enabled"""
         if not self.task2_enabled:
             logger.debug("Task 2 processing is disabled")
@@ -72,77 +73,72 @@ class ServiceScheduler:
         self.task2_enabled = enabled
         logger.info(f"Task 2 processing {'enabled' if enabled else 'disabled'}")
 
-    def toggle_kafka(self, enabled: bool, max_retries: int = 3) -> bool:
-        """Enable/disable Kafka consumer with retry mechanism"""
+    def toggle_kafka(self, enabled: bool) -> bool:
+        """Enable/disable Kafka consumer (connection retries happen inside the task)"""
         self.kafka_enabled = enabled
-        if enabled and not self.kafka_thread:
-            retry_count = 0
-            while retry_count < max_retries:
-                self.kafka_thread = start_kafka_consumer()
-                if self.kafka_thread:
-                    logger.info("Kafka consumer started successfully")
-                    return True
-                retry_count += 1
-                if retry_count < max_retries:
-                    wait_time = min(2**retry_count, 30)  # Exponential backoff capped at 30 seconds
-                    logger.warning(
-                        f"Failed to start Kafka consumer (attempt {retry_count}/{max_retries}). "
-                        f"Retrying in {wait_time} seconds..."
-                    )
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"Failed to start Kafka consumer after {max_retries} attempts")
-            return False
-        elif not enabled and self.kafka_thread:
-            # Note: This will gracefully stop on next iteration
-            self.kafka_thread = None
-            logger.info("Kafka consumer will stop on next iteration")
+        if enabled and not self.kafka_task:
+            self.kafka_task = start_kafka_consumer()
+            if not self.kafka_task:
+                return False
+            logger.info("Kafka consumer started successfully")
+            return True
+        elif not enabled and self.kafka_task:
+            self.kafka_task.cancel()
+            self.kafka_task = None
+            logger.info("Kafka consumer stopped")
             return True
         return True  # Already in desired state
 
-    def start(self):
-        """Start the scheduler with all processors"""
-        try:
-            logger.info("Starting service scheduler")
-
-            # Start Kafka consumer if enabled with retry mechanism
-            if self.kafka_enabled:
-                logger.debug("Attempting to start Kafka consumer...")
-                if not self.toggle_kafka(True):  # This includes the retry mechanism
-                    raise Exception("Failed to start Kafka consumer after maximum retries")
-
-            # Schedule notification processing every 30 seconds
-            schedule.every(30).seconds.do(self.run_process_notifications)
-
-            # Schedule generic tasks
-            schedule.every(5).minutes.do(self.run_task1)
-            schedule.every(15).minutes.do(self.run_task2)
-
-            logger.info("All tasks scheduled successfully")
-
-            # Initial health check
-            if self.kafka_enabled and (not self.kafka_thread or not self.kafka_thread.is_alive()):
-                raise Exception("Kafka consumer thread died during startup")
-
-            while True:
-                try:
-                    # Periodic health check
-                    if self.kafka_enabled and (not self.kafka_thread or not self.kafka_thread.is_alive()):
-                        raise Exception("Kafka consumer thread died")
-
-                    schedule.run_pending()
-                    time.sleep(5)  # Reduced polling frequency
-                except Exception as e:
-                    logger.error(f"Error in scheduler loop: {str(e)}")
-                    # Only sleep on transient errors, re-raise critical ones
-                    if "Kafka consumer thread died" in str(e):
-                        raise
-                    time.sleep(5)  # Prevent tight error loop
-        except Exception as e:
-            logger.error(f"Critical error in scheduler: {str(e)}")
-            raise  # Re-raise the exception to notify the parent thread
+    async def start(self):
+        """Start the scheduler with all processors on the running event loop"""
+        logger.info("Starting service scheduler")
+
+        # Start Kafka consumer if enabled
+        if self.kafka_enabled:
+            logger.debug("Attempting to start Kafka consumer...")
+            if not self.toggle_kafka(True):
+                logger.error("Failed to start Kafka consumer")
+
+        # Schedule notification processing every 30 seconds. The DB-bound jobs
+        # are plain functions, so APScheduler runs them in its thread pool
+        # instead of on the event loop.
+        self._scheduler.add_job(
+            self.run_process_notifications, "interval", seconds=30, id="notifications"
+        )
+
+        # Keep monthly notification partitions ahead of time, starting now
+        self._scheduler.add_job(
+            ensure_notification_partitions,
+            "interval",
+            days=1,
+            id="notification_partitions",
+            next_run_time=datetime.now(),
+        )
+
+        # Schedule generic tasks
+        self._scheduler.add_job(self.run_task1, "interval", minutes=5, id="task1")
+        self._scheduler.add_job(self.run_task2, "interval", minutes=15, id="task2")
+
+        self._scheduler.start()
+        logger.info("All tasks scheduled successfully")
+
+    async def stop(self):
+        """Shut down the scheduler and the Kafka consumer"""
+        if self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+
+        if self.kafka_task:
+            self.kafka_task.cancel()
+            await asyncio.gather(self.kafka_task, return_exceptions=True)
+            self.kafka_task = None
+        logger.info("Service scheduler stopped")
 
 
 if __name__ == "__main__":
-    scheduler = ServiceScheduler()
-    scheduler.start()
+
+    async def main():
+        scheduler = ServiceScheduler()
+        await scheduler.start()
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
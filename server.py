@@ -1,14 +1,16 @@
 import os
-import threading
 from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from scheduler import ServiceScheduler
+from services.users import close_http_client
+from services.users import open_http_client
 from services.users import router as user_router
 from services.webhooks import router as webhooks_router
 from services.items import router as items_router
@@ -18,10 +20,13 @@ from services.notifications import router as notifications_router
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    run_scheduler_thread()
+    open_http_client()
+    scheduler = ServiceScheduler()
+    await scheduler.start()
     yield
-    # Shutdown (if needed)
-    pass
+    # Shutdown
+    await scheduler.stop()
+    await close_http_client()
 
 
 app = FastAPI(
@@ -29,6 +34,7 @@ app = FastAPI(
     description="A generic FastAPI template with authentication, database, and Kafka integration",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -43,13 +49,6 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
-# Scheduler function
-def run_scheduler_thread():
-    scheduler = ServiceScheduler()
-    scheduler_thread = threading.Thread(target=scheduler.start, daemon=True)
-    scheduler_thread.start()
-
-
 # Include routers
 app.include_router(user_router, prefix="/users", tags=["users"])
 app.include_router(webhooks_router, prefix="/webhooks", tags=["webhooks"])
@@ -66,4 +65,8 @@ async def load_root():
 
 if __name__ == "__main__":
     port = os.getenv("PORT") or 8080
-    uvicorn.run(app, host="127.0.0.1", port=int(port))
+    # loop/http stay on "auto": uvicorn[standard] brings uvloop and httptools
+    # and uvicorn falls back to asyncio/h11 where they are unavailable. Worker
+    # count comes from WEB_CONCURRENCY (default 1); every worker runs its own
+    # lifespan scheduler.
+    uvicorn.run("server:app", host="127.0.0.1", port=int(port))
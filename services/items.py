@@ -3,10 +3,11 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from loguru import logger
 from sqlalchemy.orm import Session
+from sqlalchemy.orm import undefer_group
 
 from auth import validate_jwt
 from db import get_db
-from models import Item, ItemCreate, ItemResponse, ItemUpdate
+from models import Item, ItemCreate, ItemResponse, ItemSummary, ItemUpdate
 
 router = APIRouter()
 
@@ -36,7 +37,7 @@ async def create_item(
         raise HTTPException(status_code=500, detail="Failed to create item")
 
 
-@router.get("/", response_model=List[ItemResponse])
+@router.get("/", response_model=List[ItemSummary])
 async def get_items(
     skip: int = 0,
     limit: int = 100,
@@ -45,11 +46,13 @@ async def get_items(
 ):
     """
     Get all items for the authenticated user.
+    Description and data stay deferred; fetch a single item for those.
     """
     try:
         items = (
             db.query(Item)
             .filter(Item.user_id == user["user_id"])
+            .order_by(Item.created_at.desc())
             .offset(skip)
             .limit(limit)
             .all()
@@ -70,6 +73,7 @@ async def get_item(
     try:
         item = (
             db.query(Item)
+            .options(undefer_group("content"))
             .filter(Item.id == item_id, Item.user_id == user["user_id"])
             .first()
         )
@@ -96,6 +100,7 @@ async def update_item(
     try:
         db_item = (
             db.query(Item)
+            .options(undefer_group("content"))
             .filter(Item.id == item_id, Item.user_id == user["user_id"])
             .first()
         )
@@ -2,11 +2,13 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from loguru import logger
+from sqlalchemy import and_, insert
 from sqlalchemy.orm import Session
+from sqlalchemy.orm import undefer
 
 from auth import validate_jwt
 from db import get_db
-from models import Notification
+from models import Notification, notification_recipients
 
 router = APIRouter()
 
@@ -25,7 +27,16 @@ async def get_notifications(
         user_id = user["user_id"]
         notifications = (
             db.query(Notification)
-            .filter(Notification.users.any(user_id))
+            .options(undefer(Notification.message))
+            .join(
+                notification_recipients,
+                and_(
+                    notification_recipients.c.notification_id == Notification.id,
+                    notification_recipients.c.notification_created_at
+                    == Notification.created_at,
+                ),
+            )
+            .filter(notification_recipients.c.user_id == user_id)
             .order_by(Notification.created_at.desc())
             .offset(skip)
             .limit(limit)
@@ -59,7 +70,18 @@ async def mark_notification_read(
         user_id = user["user_id"]
         notification = (
             db.query(Notification)
-            .filter(Notification.id == notification_id, Notification.users.any(user_id))
+            .join(
+                notification_recipients,
+                and_(
+                    notification_recipients.c.notification_id == Notification.id,
+                    notification_recipients.c.notification_created_at
+                    == Notification.created_at,
+                ),
+            )
+            .filter(
+                Notification.id == notification_id,
+                notification_recipients.c.user_id == user_id,
+            )
             .first()
         )
         
@@ -85,12 +107,23 @@ def create_notification(db: Session, users: List[int], event: str, message: str)
     """
     try:
         notification = Notification(
-            users=users,
             event=event,
             message=message,
             sent_status=False,
         )
         db.add(notification)
+        db.flush()
+        db.execute(
+            insert(notification_recipients),
+            [
+                {
+                    "user_id": user_id,
+                    "notification_id": notification.id,
+                    "notification_created_at": notification.created_at,
+                }
+                for user_id in users
+            ],
+        )
         db.commit()
         return notification
     except Exception as e:
@@ -1,10 +1,10 @@
+import asyncio
 import io
+import time
 from datetime import date, datetime, timedelta, timezone
 from typing import Dict, Optional, List
-from uuid import uuid4
 
 import httpx
-import jwt
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import File
@@ -13,6 +13,10 @@ from fastapi import UploadFile
 from loguru import logger
 from PIL import Image
 from pydantic import BaseModel
+from pydantic import Field
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from twilio.base.exceptions import TwilioRestException
 from twilio.rest import Client
@@ -31,13 +35,22 @@ from auth import (
 )
 from db import get_db
 from env import get_settings
+from memcache import delete_cached_data
 from memcache import get_cached_data
+from memcache import get_cached_many
 from memcache import set_cached_data
+from memcache import set_cached_many
+from memcache import try_get_cached_many
 from models import DeviceToken
 from models import User
 
 router = APIRouter()
 
+SETTINGS = get_settings()
+
+ACCESS_TOKEN_TTL = timedelta(hours=24)
+ACCESS_TOKEN_TTL_SECONDS = int(ACCESS_TOKEN_TTL.total_seconds())
+
 
 # Service models
 class SmsVerify(BaseModel):
@@ -71,6 +84,10 @@ class UserResponse(BaseModel):
     is_onboarded: bool
 
 
+class AvatarBatchRequest(BaseModel):
+    user_ids: List[int] = Field(min_length=1, max_length=100)
+
+
 class UserUpdate(BaseModel):
     first_name: Optional[str] | None = None
     last_name: Optional[str] | None = None
@@ -146,6 +163,15 @@ class PasswordLogin(BaseModel):
 
 
 # Service helper functions
+def _now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO 8601 string with a Z suffix"""
+    return _now_utc().isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
 def is_valid_phone_number(phone: str):
     if phone == "invalid_phone":
         return False
@@ -153,9 +179,18 @@ def is_valid_phone_number(phone: str):
         return True
 
 
+# str.translate table that drops every non-digit ASCII character
+_DROP_ASCII_NON_DIGITS = str.maketrans(
+    "", "", "".join(chr(c) for c in range(128) if not chr(c).isdigit())
+)
+
+
 def sanitize_number(phone: str):
     # Remove any non-digit characters
-    digits_only = "".join(filter(str.isdigit, phone))
+    if phone.isascii():
+        digits_only = phone.translate(_DROP_ASCII_NON_DIGITS)
+    else:
+        digits_only = "".join(filter(str.isdigit, phone))
     # If number started with a + we assume it is already a full number
     if phone[0] == "+":
         return f"+{digits_only}"
@@ -169,22 +204,112 @@ def sanitize_number(phone: str):
     return f"+{digits_only}" if not phone.startswith("+") else phone
 
 
-def ignore_validation(phone: str):
-    return phone in [
+_IGNORED_PHONES: frozenset[str] = frozenset(
+    {
         "+15625555555",
         "+15625551111",
         "+11234567890",
         "+15551234567",
         "+15625944162",
-    ]
+    }
+)
+
+
+def ignore_validation(phone: str):
+    return phone in _IGNORED_PHONES
+
+
+# Columns behind UserResponse, for UPDATE ... RETURNING and narrow selects
+_USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.first_name,
+    User.last_name,
+    User.phone,
+    User.phone_verified,
+    User.email,
+    User.email_verified,
+    User.picture,
+)
+
+
+_UPDATABLE_USER_FIELDS = ("first_name", "last_name", "picture")
+
+
+def _user_cache_key(user_id: int) -> str:
+    return f"user:ctx:{user_id}"
+
+
+def _deleted_user_key(user_id: int) -> str:
+    return f"deleted_user:{user_id}"
+
+
+# user_id -> monotonic deadline. Users whose /me snapshot could not be
+# refreshed or cleared read /me from the database on this worker until any
+# stale snapshot left in Redis has expired.
+_USER_CONTEXT_BYPASS: Dict[int, float] = {}
+
+
+def _user_context_ttl() -> int:
+    # Edits must outlive older tokens only while /me may answer from claims
+    if SETTINGS.me_from_token_claims:
+        return ACCESS_TOKEN_TTL_SECONDS
+    return USER_CONTEXT_CACHE_TTL
+
+
+def _bypass_user_context(user_id: int):
+    """Skip the /me cache for a user whose snapshot may be stale"""
+    now = time.monotonic()
+    for stale_id, deadline in list(_USER_CONTEXT_BYPASS.items()):
+        if deadline <= now:
+            del _USER_CONTEXT_BYPASS[stale_id]
+    _USER_CONTEXT_BYPASS[user_id] = now + _user_context_ttl()
+
+
+def _user_context_bypassed(user_id: int) -> bool:
+    deadline = _USER_CONTEXT_BYPASS.get(user_id)
+    if deadline is None:
+        return False
+    if deadline <= time.monotonic():
+        _USER_CONTEXT_BYPASS.pop(user_id, None)
+        return False
+    return True
+
+
+def _cache_user_context(response: UserResponse, expire_seconds: int = None) -> bool:
+    """Store the /me payload so repeat reads skip the database"""
+    return set_cached_data(
+        _user_cache_key(response.id),
+        response.model_dump(),
+        expire_seconds or USER_CONTEXT_CACHE_TTL,
+    )
+
+
+def _refresh_user_context(response: UserResponse):
+    """Replace the /me snapshot after a profile change"""
+    if not _cache_user_context(response, _user_context_ttl()):
+        _bypass_user_context(response.id)
 
 
 def resize_image(image: Image.Image, max_size: tuple) -> Image.Image:
     """Resize image while maintaining aspect ratio"""
-    image.thumbnail(max_size)
+    # Bilinear is indistinguishable from Lanczos at avatar size and much cheaper.
+    # reducing_gap lets JPEGs decode at a reduced DCT scale that still keeps
+    # about 2x the target size, so the final resample has pixels to work with.
+    image.thumbnail(max_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
     return image
 
 
+def _decode_resize_encode(content: bytes) -> tuple[bytes, str, str]:
+    """Decode, shrink and re-encode an avatar; returns (body, format, content type)"""
+    img = Image.open(io.BytesIO(content))
+    fmt = img.format
+    img = resize_image(img, MAX_AVATAR_IMAGE_SIZE)
+
+    buf = io.BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue(), fmt, Image.MIME.get(fmt, "application/octet-stream")
+
+
 def update_user_avatar(user: User, picture: str, db: Session):
     if not user:
         raise HTTPException(status_code=404, detail="No user found.")
@@ -193,7 +318,6 @@ def update_user_avatar(user: User, picture: str, db: Session):
             user.picture = picture
         db.commit()
 
-        user = get_user(db, phone=user.phone)
         response: UserResponse = UserResponse(
             id=user.id,
             first_name=user.first_name,
@@ -205,6 +329,7 @@ def update_user_avatar(user: User, picture: str, db: Session):
             picture=user.picture,
             is_onboarded=True if user.first_name else False,
         )
+        _refresh_user_context(response)
 
         # Update the avatar cache with new data
         cache_key = f"avatar:{user.id}"
@@ -229,11 +354,18 @@ def update_user_avatar(user: User, picture: str, db: Session):
 
 
 def create_token_response(
-    user: User, db: Session, device_info: str = None
+    user: User,
+    db: Session,
+    device_info: str = None,
+    *,
+    reuse_refresh_token: str | None = None,
 ) -> TokenResponse:
-    """Helper function to create a consistent token response"""
+    """
+    Helper function to create a consistent token response.
+    Pass reuse_refresh_token to return an existing refresh token instead of
+    issuing a new one.
+    """
     # Create access token (24 hours)
-    access_token_expires = timedelta(hours=24)
     access_token = create_access_token(
         data={
             "sub": str(user.id),
@@ -245,33 +377,60 @@ def create_token_response(
             "phone": user.phone,
             "phone_verified": user.phone_verified,
             "picture": user.picture,
-            "updated_at": datetime.now().isoformat() + "Z",
+            "updated_at": _now_iso(),
             "admin": False,
             "password_set": bool(user.password_hash),
         },
-        expires_delta=access_token_expires,
+        expires_delta=ACCESS_TOKEN_TTL,
     )
 
-    # Create refresh token (90 days)
-    refresh_token = create_refresh_token(db, user.id, device_info)
+    # Create refresh token (90 days) unless the caller already holds one
+    refresh_token = reuse_refresh_token or create_refresh_token(
+        db, user.id, device_info
+    )
 
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
         "token_type": "bearer",
         "user_id": user.id,
-        "expires_in": int(access_token_expires.total_seconds()),
+        "expires_in": ACCESS_TOKEN_TTL_SECONDS,
     }
 
 
 # Custom clients and settings
-twilio_client = Client(
-    get_settings().twilio_client_id, get_settings().twilio_client_key
-)
-twilio_verify = twilio_client.verify.services(get_settings().twilio_verify)
+twilio_client = Client(SETTINGS.twilio_client_id, SETTINGS.twilio_client_key)
+twilio_verify = twilio_client.verify.services(SETTINGS.twilio_verify)
 
 MAX_AVATAR_FILE_SIZE = 1 * 1024 * 1024  # 1MB
 MAX_AVATAR_IMAGE_SIZE = (300, 300)
+AVATAR_READ_CHUNK_SIZE = 64 * 1024
+USER_CONTEXT_CACHE_TTL = 60  # seconds; bounds staleness on other workers
+DELETED_USER_CACHE_TTL = 3600 * 24 * 7  # well past the access token lifetime
+
+# Shared outbound client so uploads reuse pooled keep-alive connections.
+# Opened and closed by the app lifespan in server.py.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def open_http_client() -> httpx.AsyncClient:
+    """Create the shared outbound HTTP client if it is not open yet"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared outbound HTTP client"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
 @router.get("/me", response_model=UserResponse)
@@ -279,29 +438,42 @@ async def read_users_me(
     db: Session = Depends(get_db), user: dict = Depends(validate_jwt)
 ):
     try:
-        user = get_user(db, phone=user["phone"])
-        if not user:
-            logger.warning(f"User not found for phone: {user['phone']}")
-            raise HTTPException(status_code=404, detail="No user found")
-
-        try:
-            user_id: int = user.id
-            if user_id is None:
-                raise HTTPException(
-                    status_code=401, detail="Invalid authentication credentials"
-                )
-        except jwt.PyJWTError as e:
-            logger.error(f"JWT validation error: {str(e)}")
-            raise HTTPException(
-                status_code=401, detail="Invalid authentication credentials"
+        user_id = user["user_id"]
+        cache_key = _user_cache_key(user_id)
+        deleted_key = _deleted_user_key(user_id)
+        if _user_context_bypassed(user_id):
+            cached = None
+        else:
+            cached = try_get_cached_many([cache_key, deleted_key])
+        if cached is not None:
+            if deleted_key in cached:
+                raise HTTPException(status_code=404, detail="No user found")
+            if cache_key in cached:
+                return UserResponse(**cached[cache_key])
+
+        # Claims are only as fresh as the token, so they are served only once
+        # Redis has confirmed there is no newer snapshot or deletion marker.
+        # A Redis error goes to the database instead.
+        if cached is not None and SETTINGS.me_from_token_claims:
+            return UserResponse(
+                id=user_id,
+                first_name=user["first_name"],
+                last_name=user["last_name"],
+                phone=user["phone"],
+                phone_verified=user["phone_verified"],
+                email=user["email"],
+                email_verified=user["email_verified"],
+                picture=user["picture"],
+                is_onboarded=bool(user["first_name"]),
             )
 
-        user = db.query(User).filter(User.id == user_id).first()
-        if user is None:
-            logger.warning(f"User not found for id: {user_id}")
-            raise HTTPException(status_code=404, detail="User not found")
+        phone = user["phone"]
+        user = get_user(db, phone=phone)
+        if not user:
+            logger.warning(f"User not found for phone: {phone}")
+            raise HTTPException(status_code=404, detail="No user found")
 
-        return UserResponse(
+        response = UserResponse(
             id=user.id,
             first_name=user.first_name,
             last_name=user.last_name,
@@ -312,6 +484,10 @@ async def read_users_me(
             picture=user.picture,
             is_onboarded=True if user.first_name else False,
         )
+        if _cache_user_context(response):
+            # The fresh snapshot replaced whatever stale one was left
+            _USER_CONTEXT_BYPASS.pop(user_id, None)
+        return response
 
     except HTTPException:
         raise
@@ -327,42 +503,42 @@ async def update_users_me(
     user: dict = Depends(validate_jwt),
 ):
     try:
-        db_user = get_user_by_id(db, user_id=user["user_id"])
-        if not db_user:
-            logger.warning("User not found for update")
-            raise HTTPException(status_code=404, detail="No user found")
+        # birth_date/postal_code are accepted but have no User column to land in
+        values = {
+            key: value
+            for key, value in updates.model_dump(
+                include=set(_UPDATABLE_USER_FIELDS), exclude_unset=True
+            ).items()
+            if value is not None
+        }
 
         try:
-            if updates.first_name is not None:
-                db_user.first_name = updates.first_name
-            if updates.last_name is not None:
-                db_user.last_name = updates.last_name
-            if updates.picture is not None:
-                db_user.picture = updates.picture
-            if updates.birth_date is not None:
-                db_user.birth_date = updates.birth_date
-            if updates.postal_code is not None:
-                db_user.postal_code = updates.postal_code
-
-            db.commit()
+            # Single round trip: write the changes and read back the response row
+            if values:
+                row = db.execute(
+                    update(User)
+                    .where(User.id == user["user_id"])
+                    .values(**values)
+                    .returning(*_USER_RESPONSE_COLUMNS)
+                ).first()
+                db.commit()
+            else:
+                row = db.execute(
+                    select(*_USER_RESPONSE_COLUMNS).where(User.id == user["user_id"])
+                ).first()
 
         except Exception as e:
             logger.error(f"Database error updating user: {str(e)}")
             db.rollback()
             raise HTTPException(status_code=500, detail="Failed to update user")
 
-        updated_user = db_user
-        return UserResponse(
-            id=updated_user.id,
-            first_name=updated_user.first_name,
-            last_name=updated_user.last_name,
-            phone=updated_user.phone,
-            phone_verified=updated_user.phone_verified,
-            email=updated_user.email,
-            email_verified=updated_user.email_verified,
-            picture=updated_user.picture,
-            is_onboarded=True if updated_user.first_name else False,
-        )
+        if not row:
+            logger.warning("User not found for update")
+            raise HTTPException(status_code=404, detail="No user found")
+
+        response = UserResponse(**row._mapping, is_onboarded=bool(row.first_name))
+        _refresh_user_context(response)
+        return response
 
     except HTTPException:
         raise
@@ -374,7 +550,9 @@ async def update_users_me(
 @router.get("/me/token", response_model=TokenResponse)
 async def get_token(db: Session = Depends(get_db), user: dict = Depends(validate_jwt)):
     try:
-        user = get_user(db, phone=user["phone"])
+        # By id rather than phone: get_user skips deleted accounts, and those
+        # must still get a 403 here rather than a 404
+        user = get_user_by_id(db, user_id=user["user_id"])
         if not user:
             raise HTTPException(status_code=404, detail="No user found")
 
@@ -411,32 +589,9 @@ async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_
             raise HTTPException(status_code=403, detail="Account has been deleted")
 
         # Create a new access token with the same refresh token
-        access_token_expires = timedelta(hours=24)
-        access_token = create_access_token(
-            data={
-                "sub": str(user.id),
-                "user_id": user.id,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "email": user.email,
-                "email_verified": user.email_verified,
-                "phone": user.phone,
-                "phone_verified": user.phone_verified,
-                "picture": user.picture,
-                "updated_at": datetime.now().isoformat() + "Z",
-                "admin": False,
-                "password_set": bool(user.password_hash),
-            },
-            expires_delta=access_token_expires,
+        return create_token_response(
+            user, db, "refresh", reuse_refresh_token=request.refresh_token
         )
-
-        return {
-            "access_token": access_token,
-            "refresh_token": request.refresh_token,  # Return the same refresh token
-            "token_type": "bearer",
-            "user_id": user.id,
-            "expires_in": int(access_token_expires.total_seconds()),
-        }
     except HTTPException:
         raise
     except Exception as e:
@@ -497,60 +652,64 @@ async def upload_image(
             logger.warning("User not found for avatar upload")
             raise HTTPException(status_code=404, detail="No user found")
 
-        # Validate file size
+        # Validate file size, rejecting oversized uploads before copying them
         try:
-            await image.seek(0)
-            content = await image.read()
-            if len(content) > MAX_AVATAR_FILE_SIZE:
-                logger.warning(
-                    f"Avatar upload exceeds size limit: {len(content)} bytes"
-                )
+            if image.size is not None and image.size > MAX_AVATAR_FILE_SIZE:
+                logger.warning(f"Avatar upload exceeds size limit: {image.size} bytes")
                 raise HTTPException(
                     status_code=400, detail="File size exceeds 1MB limit"
                 )
+
+            await image.seek(0)
+            buf = bytearray()
+            while chunk := await image.read(AVATAR_READ_CHUNK_SIZE):
+                buf.extend(chunk)
+                if len(buf) > MAX_AVATAR_FILE_SIZE:
+                    logger.warning(
+                        f"Avatar upload exceeds size limit: over {len(buf)} bytes"
+                    )
+                    raise HTTPException(
+                        status_code=400, detail="File size exceeds 1MB limit"
+                    )
+            content = bytes(buf)
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error reading upload file: {str(e)}")
             raise HTTPException(status_code=400, detail="Invalid file upload")
 
-        # Process image
+        # Process image in a worker thread; Pillow blocks for the whole decode
         try:
-            img = Image.open(io.BytesIO(content))
-            img = resize_image(img, MAX_AVATAR_IMAGE_SIZE)
-
-            buf = io.BytesIO()
-            img.save(buf, format=img.format)
-            buf.seek(0)
-
+            body, _, content_type = await asyncio.to_thread(
+                _decode_resize_encode, content
+            )
         except Exception as e:
             logger.error(f"Error processing image: {str(e)}")
             raise HTTPException(status_code=400, detail="Invalid image format")
 
         # Upload to Cloudflare
         try:
-            headers = {"Authorization": f"Bearer {get_settings().cloudflare_api_token}"}
+            headers = {"Authorization": f"Bearer {SETTINGS.cloudflare_api_token}"}
 
-            files = {"file": (image.filename, buf, image.content_type)}
+            files = {"file": (image.filename, body, content_type)}
 
             unique_identifier = f"user_avatar_{db_user.id}"
             params = {"id": unique_identifier}
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    get_settings().cloudflare_image_upload_url,
-                    headers=headers,
-                    files=files,
-                    params=params,
-                )
+            response = await open_http_client().post(
+                SETTINGS.cloudflare_image_upload_url,
+                headers=headers,
+                files=files,
+                params=params,
+            )
 
-                if response.status_code != 200:
-                    logger.error(f"Cloudflare upload failed: {response.text}")
-                    raise HTTPException(
-                        status_code=500, detail="Failed to upload image"
-                    )
+            if response.status_code != 200:
+                logger.error(f"Cloudflare upload failed: {response.text}")
+                raise HTTPException(status_code=500, detail="Failed to upload image")
 
-                payload = response.json()
-                picture = payload["result"]["variants"][0]
-                return update_user_avatar(db_user, picture, db)
+            payload = response.json()
+            picture = payload["result"]["variants"][0]
+            return update_user_avatar(db_user, picture, db)
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error during image upload: {str(e)}")
@@ -579,7 +738,12 @@ async def get_avatar(user_id: int, db: Session = Depends(get_db)):
 
     # Get from database (either cache miss or cache error)
     try:
-        user = get_user_by_id(db, user_id=user_id)
+        # Only the columns the avatar needs, without hydrating a User
+        user = db.execute(
+            select(User.first_name, User.last_name, User.picture).where(
+                User.id == user_id, User.is_deleted.is_(False)
+            )
+        ).first()
         if not user:
             logger.error(f"No user found for avatar:{user_id}")
             raise HTTPException(status_code=404, detail="No user found.")
@@ -608,6 +772,46 @@ async def get_avatar(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/avatars/batch")
+async def get_avatars(request: AvatarBatchRequest, db: Session = Depends(get_db)):
+    """Get several user avatars with one cache round trip and one query for misses"""
+    user_ids = list(dict.fromkeys(request.user_ids))
+    cached = get_cached_many([f"avatar:{user_id}" for user_id in user_ids])
+    avatars = {data["id"]: data for data in cached.values()}
+
+    missing = [user_id for user_id in user_ids if user_id not in avatars]
+    if missing:
+        try:
+            users = db.execute(
+                select(User.id, User.first_name, User.last_name, User.picture).where(
+                    User.id.in_(missing), User.is_deleted.is_(False)
+                )
+            ).all()
+        except Exception as e:
+            logger.error(f"Database error for avatar batch: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+        fetched = {
+            user.id: {
+                "id": user.id,
+                "first_name": user.first_name,
+                "last_initial": user.last_name[0] if user.last_name else "",
+                "picture": user.picture,
+            }
+            for user in users
+        }
+        avatars.update(fetched)
+
+        # Backfill the cache, but don't fail the request on cache errors
+        if not set_cached_many(
+            {f"avatar:{user_id}": data for user_id, data in fetched.items()}, 3600
+        ):
+            logger.warning(f"Failed to cache {len(fetched)} avatars")
+
+    # Preserve request order; unknown ids are left out
+    return [avatars[user_id] for user_id in user_ids if user_id in avatars]
+
+
 @router.post("/sms/code")
 async def send_verification_sms(phone: str, db: Session = Depends(get_db)):
     try:
@@ -622,10 +826,10 @@ async def send_verification_sms(phone: str, db: Session = Depends(get_db)):
         formatted_phone = sanitize_number(phone)
         logger.debug(f"Formatted phone number: {formatted_phone}")
 
-        # Attempt to send verification code via Twilio
+        # Attempt to send verification code via Twilio; the SDK blocks on HTTPS
         try:
-            verification = twilio_verify.verifications.create(
-                to=formatted_phone, channel="sms"
+            verification = await asyncio.to_thread(
+                twilio_verify.verifications.create, to=formatted_phone, channel="sms"
             )
             if verification.status != "pending":
                 logger.error(
@@ -661,15 +865,22 @@ async def delete_account(
 
         # Mark user as deleted
         db_user.is_deleted = True
-        db_user.deleted_at = datetime.now(timezone.utc)
-        # Update phone number to prevent reuse with random number
-        random_suffix = str(uuid4().int % 10000)  # Get random number between 0-9999
-        db_user.phone = f"__{db_user.phone}__{random_suffix}"
+        deleted_at = _now_utc()
+        db_user.deleted_at = deleted_at
 
         # Revoke all refresh tokens
         revoke_all_user_tokens(db, db_user.id)
 
         db.commit()
+        cleared = delete_cached_data(_user_cache_key(user["user_id"]))
+        # Access tokens stay valid until expiry; remember the deletion past that
+        marked = set_cached_data(
+            _deleted_user_key(user["user_id"]),
+            {"deleted_at": deleted_at.isoformat()},
+            DELETED_USER_CACHE_TTL,
+        )
+        if not (cleared and marked):
+            _bypass_user_context(user["user_id"])
         return {"message": "Account successfully deleted"}
 
     except HTTPException:
@@ -691,9 +902,13 @@ async def verify_sms(info: SmsVerify, db: Session = Depends(get_db)):
             and ignore_validation(formatted_phone)
         ):
             try:
-                verification_check = twilio_client.verify.v2.services(
-                    "VAad1486b23a345a16ab35e09379f67ead"
-                ).verification_checks.create(to=formatted_phone, code=info.code)
+                verification_check = await asyncio.to_thread(
+                    twilio_client.verify.v2.services(
+                        "VAad1486b23a345a16ab35e09379f67ead"
+                    ).verification_checks.create,
+                    to=formatted_phone,
+                    code=info.code,
+                )
                 if verification_check.status != "approved":
                     logger.warning(
                         f"Failed verification attempt for phone: {formatted_phone}"
@@ -715,32 +930,33 @@ async def verify_sms(info: SmsVerify, db: Session = Depends(get_db)):
         info.phone = formatted_phone
 
         # Handle user creation/update
+        # Each branch is one statement that also returns the token claims
         try:
-            user = get_user(db, phone=info.phone)
-            if user:
-                if user.is_deleted:
-                    raise HTTPException(
-                        status_code=403, detail="Account has been deleted"
+            now = _now_utc()
+            user = db.execute(
+                update(User)
+                .where(User.phone == info.phone, User.is_deleted.is_(False))
+                .values(last_logged_in=now)
+                .returning(*_USER_RESPONSE_COLUMNS, User.password_hash)
+            ).first()
+            if not user:
+                user = db.execute(
+                    insert(User)
+                    .values(
+                        phone=info.phone,
+                        phone_verified=True,
+                        first_name="",
+                        last_name="",
+                        email="",
+                        email_verified=False,
+                        picture="",
+                        last_logged_in=now,
                     )
-                user.last_logged_in = datetime.utcnow()
-            else:
-                user = User(
-                    phone=info.phone,
-                    phone_verified=True,
-                    first_name="",
-                    last_name="",
-                    email="",
-                    email_verified=False,
-                    picture="",
-                    last_logged_in=datetime.utcnow(),
-                    created_at=datetime.utcnow(),
-                )
-                db.add(user)
+                    .returning(*_USER_RESPONSE_COLUMNS, User.password_hash)
+                ).first()
 
             db.commit()
 
-            user = get_user(db, phone=info.phone)
-
         except Exception as e:
             logger.error(f"Database error during user creation/update: {str(e)}")
             db.rollback()
@@ -772,17 +988,35 @@ async def set_password(
 ):
     """Set or update user password"""
     try:
-        db_user = get_user_by_id(db, user_id=user["user_id"])
-        if not db_user:
+        row = db.execute(
+            select(*_USER_RESPONSE_COLUMNS, User.password_hash).where(
+                User.id == user["user_id"]
+            )
+        ).first()
+        if not row:
             raise HTTPException(status_code=404, detail="User not found")
 
-        # Update password
-        db_user.password_hash = get_password_hash(password_update.new_password)
-        db.commit()
+        # bcrypt is deliberately slow; keep it off the event loop and skip the
+        # rehash when the submitted password is already the stored one
+        unchanged = row.password_hash and await asyncio.to_thread(
+            verify_password, password_update.new_password, row.password_hash
+        )
+        if not unchanged:
+            new_hash = await asyncio.to_thread(
+                get_password_hash, password_update.new_password
+            )
+            # Update password and read back the token claims in one round trip
+            row = db.execute(
+                update(User)
+                .where(User.id == user["user_id"])
+                .values(password_hash=new_hash)
+                .returning(*_USER_RESPONSE_COLUMNS, User.password_hash)
+            ).first()
+            db.commit()
 
         # Generate new tokens
         device_info = "Password set device"
-        return create_token_response(db_user, db, device_info)
+        return create_token_response(row, db, device_info)
 
     except HTTPException:
         raise
@@ -806,7 +1040,9 @@ async def login_with_password(
 
         # Then check password matches if user has password login enabled
         if user.password_hash:
-            if not verify_password(password_login.password, user.password_hash):
+            if not await asyncio.to_thread(
+                verify_password, password_login.password, user.password_hash
+            ):
                 raise HTTPException(status_code=401, detail="Invalid credentials")
         else:
             # User exists but hasn't set up password login
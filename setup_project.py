@@ -2,14 +2,29 @@
 import os
 import re
 import sys
-import random
+import mmap
 import argparse
 from pathlib import Path
 
 
-def generate_random_port(base_port):
-    """Generate a random port number within a range to avoid conflicts."""
-    return base_port + random.randint(0, 1000)
+def generate_random_ports(*base_ports):
+    """Generate a random port within 1000 of each base port to avoid conflicts."""
+    # One urandom read, two bytes per port
+    raw = os.urandom(2 * len(base_ports))
+    return [
+        base_port + int.from_bytes(raw[2 * i:2 * i + 2], 'little') % 1001
+        for i, base_port in enumerate(base_ports)
+    ]
+
+
+def file_contains_any(file_path, needles):
+    """Check whether a file contains any of the strings, without decoding it."""
+    if os.path.getsize(file_path) == 0:
+        return False
+
+    with open(file_path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return any(mm.find(needle.encode('utf-8')) != -1 for needle in needles)
 
 
 def replace_in_file(file_path, replacements):
@@ -18,18 +33,44 @@ def replace_in_file(file_path, replacements):
         print(f"Warning: File {file_path} does not exist. Skipping.")
         return
 
-    with open(file_path, 'r') as file:
+    if not file_contains_any(file_path, replacements):
+        print(f"No changes needed in {file_path}")
+        return
+
+    with open(file_path, 'r', encoding='utf-8') as file:
         content = file.read()
 
-    for old, new in replacements.items():
-        content = content.replace(old, new)
+    # One scan for all keys; longest first so a key never loses to its prefix
+    pattern = re.compile('|'.join(
+        re.escape(old) for old in sorted(replacements, key=len, reverse=True)
+    ))
+    new_content = pattern.sub(lambda match: replacements[match.group(0)], content)
+    if new_content == content:
+        print(f"No changes needed in {file_path}")
+        return
 
-    with open(file_path, 'w') as file:
-        file.write(content)
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write(new_content)
     
     print(f"Updated {file_path}")
 
 
+# Replacements queued per file, applied with one read/write each by flush_all()
+_PENDING: dict[str, dict[str, str]] = {}
+
+
+def queue_replacements(file_path, replacements):
+    """Queue replacements for a file; later keys for the same file are merged."""
+    _PENDING.setdefault(file_path, {}).update(replacements)
+
+
+def flush_all():
+    """Apply all queued replacements, reading and writing each file once."""
+    for file_path, replacements in _PENDING.items():
+        replace_in_file(file_path, replacements)
+    _PENDING.clear()
+
+
 def update_docker_compose(project_name, postgres_port, redis_port, pgadmin_port, kafka_port):
     """Update the docker-compose.yml file with new project name and ports."""
     replacements = {
@@ -43,7 +84,7 @@ def update_docker_compose(project_name, postgres_port, redis_port, pgadmin_port,
         '9092:9092': f'{kafka_port}:9092',
     }
     
-    replace_in_file('docker-compose.yml', replacements)
+    queue_replacements('docker-compose.yml', replacements)
 
 
 def update_env_files(project_name, postgres_port, redis_port, kafka_port):
@@ -53,7 +94,7 @@ def update_env_files(project_name, postgres_port, redis_port, kafka_port):
         'FASTAPITEMPLATE_SQL_DATABASE="fastapitemplate"': f'{project_name.upper()}_SQL_DATABASE="{project_name}"',
         'FASTAPITEMPLATE_': f'{project_name.upper()}_'
     }
-    replace_in_file('.env.base', base_replacements)
+    queue_replacements('.env.base', base_replacements)
     
     # Update .env.dev
     dev_replacements = {
@@ -62,39 +103,27 @@ def update_env_files(project_name, postgres_port, redis_port, kafka_port):
         'FASTAPITEMPLATE_KAFKA_PORT="9092"': f'{project_name.upper()}_KAFKA_PORT="{kafka_port}"',
         'FASTAPITEMPLATE_': f'{project_name.upper()}_'
     }
-    replace_in_file('.env.dev', dev_replacements)
+    queue_replacements('.env.dev', dev_replacements)
     
     # Update .env.prod
     prod_replacements = {
         'FASTAPITEMPLATE_': f'{project_name.upper()}_'
     }
-    replace_in_file('.env.prod', prod_replacements)
+    queue_replacements('.env.prod', prod_replacements)
 
 
 def update_server_title(project_name):
     """Update the server title in server.py."""
-    file_path = 'server.py'
-    if not os.path.exists(file_path):
-        print(f"Warning: File {file_path} does not exist. Skipping.")
-        return
-    
-    with open(file_path, 'r') as file:
-        content = file.read()
-    
-    # Replace the FastAPI title
-    pattern = r'title="FastAPI Template"'
-    replacement = f'title="{project_name.capitalize()}"'
-    content = re.sub(pattern, replacement, content)
-    
-    # Replace the root endpoint message
-    pattern = r'"FastAPI Template - Awake and ready to serve!"'
-    replacement = f'"{project_name.capitalize()} - Awake and ready to serve!"'
-    content = re.sub(pattern, replacement, content)
-    
-    with open(file_path, 'w') as file:
-        file.write(content)
-    
-    print(f"Updated {file_path}")
+    title = project_name.capitalize()
+
+    # Replace the FastAPI title and the root endpoint message; both are
+    # fixed strings, so no regex is needed
+    replacements = {
+        'title="FastAPI Template"': f'title="{title}"',
+        '"FastAPI Template - Awake and ready to serve!"': f'"{title} - Awake and ready to serve!"',
+    }
+
+    queue_replacements('server.py', replacements)
 
 
 def update_env_py(project_name):
@@ -150,10 +179,11 @@ def main():
     project_name = args.name or 'fastapi_project'
     
     # Generate random ports if not provided
-    postgres_port = args.postgres_port or generate_random_port(30000)
-    redis_port = args.redis_port or generate_random_port(31000)
-    pgadmin_port = args.pgadmin_port or generate_random_port(16000)
-    kafka_port = args.kafka_port or generate_random_port(9000)
+    random_ports = generate_random_ports(30000, 31000, 16000, 9000)
+    postgres_port = args.postgres_port or random_ports[0]
+    redis_port = args.redis_port or random_ports[1]
+    pgadmin_port = args.pgadmin_port or random_ports[2]
+    kafka_port = args.kafka_port or random_ports[3]
     
     print(f"Setting up project with name: {project_name}")
     print(f"Using ports: PostgreSQL={postgres_port}, Redis={redis_port}, PGAdmin={pgadmin_port}, Kafka={kafka_port}")
@@ -164,6 +194,7 @@ def main():
     update_server_title(project_name)
     update_env_py(project_name)
     update_alembic_readme()
+    flush_all()
     
     print("\nProject setup complete!")
     print(f"\nTo start your project, run:")
@@ -0,0 +1,21 @@
+import auth
+import models
+from env import get_settings
+from env import reload_settings
+from services import users
+
+
+def test_reload_settings_rebinds_module_settings(monkeypatch):
+    monkeypatch.setenv("FASTAPITEMPLATE_ME_FROM_TOKEN_CLAIMS", "true")
+    try:
+        settings = reload_settings()
+
+        assert settings is get_settings()
+        assert settings.me_from_token_claims is True
+        for module in (auth, models, users):
+            assert module.SETTINGS is settings
+    finally:
+        monkeypatch.undo()
+        reload_settings()
+
+    assert users.SETTINGS.me_from_token_claims is False
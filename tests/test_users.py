@@ -0,0 +1,172 @@
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from redis import ConnectionError
+
+import memcache
+from auth import validate_jwt
+from db import SessionLocal
+from models import User
+from server import app
+from services import users
+
+
+class _UnreachableRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("Redis is down")
+
+        return fail
+
+
+class _ReadOnlyRedis:
+    """Serves what it holds but fails every write, like a failing replica"""
+
+    def __init__(self):
+        self.data = {}
+        self.writable = True
+
+    def _write(self):
+        if not self.writable:
+            raise ConnectionError("Redis is read-only")
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def setex(self, name, time, value):
+        self._write()
+        self.data[name] = value
+
+    def delete(self, *keys):
+        self._write()
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture
+def redis_down(monkeypatch):
+    monkeypatch.setattr(memcache, "get_redis", lambda: _UnreachableRedis())
+
+
+@pytest.fixture
+def claims_enabled(monkeypatch):
+    settings = users.SETTINGS.model_copy(update={"me_from_token_claims": True})
+    monkeypatch.setattr(users, "SETTINGS", settings)
+
+
+@pytest.fixture
+def redis_read_only(monkeypatch):
+    redis = _ReadOnlyRedis()
+    monkeypatch.setattr(memcache, "get_redis", lambda: redis)
+    return redis
+
+
+@pytest.fixture
+def db_user():
+    db = SessionLocal()
+    suffix = uuid4().hex[:8]
+    user = User(
+        first_name="Test",
+        last_name="User",
+        phone=f"+1555{int(suffix, 16) % 10**7:07d}",
+        email=f"test-{suffix}@example.com",
+        picture="https://example.com/avatar.png",
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    try:
+        yield user
+    finally:
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+@pytest.fixture
+def client(db_user):
+    # The claims create_token_response puts in the access token
+    claims = {
+        "sub": str(db_user.id),
+        "user_id": db_user.id,
+        "first_name": db_user.first_name,
+        "last_name": db_user.last_name,
+        "email": db_user.email,
+        "email_verified": db_user.email_verified,
+        "phone": db_user.phone,
+        "phone_verified": db_user.phone_verified,
+        "picture": db_user.picture,
+    }
+    app.dependency_overrides[validate_jwt] = lambda: claims
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_update_users_me_ignores_fields_without_columns(client, db_user):
+    response = client.put(
+        "/users/me",
+        json={"first_name": "Ada", "birth_date": "1990-01-01", "postal_code": "94107"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Ada"
+    assert response.json()["is_onboarded"] is True
+
+
+def test_get_token_rejects_deleted_account(client, db_user):
+    assert client.delete("/users/me").status_code == 200
+
+    response = client.get("/users/me/token")
+
+    assert response.status_code == 403
+
+
+def test_read_users_me_shows_profile_edit_when_redis_is_down(
+    client, redis_down, claims_enabled
+):
+    assert client.put("/users/me", json={"first_name": "Z"}).status_code == 200
+
+    response = client.get("/users/me")
+
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Z"
+
+
+def test_read_users_me_after_delete_when_redis_is_down(
+    client, redis_down, claims_enabled
+):
+    assert client.delete("/users/me").status_code == 200
+
+    response = client.get("/users/me")
+
+    assert response.status_code == 404
+
+
+def test_read_users_me_skips_snapshot_that_could_not_be_refreshed(
+    client, redis_read_only
+):
+    assert client.get("/users/me").json()["first_name"] == "Test"
+    redis_read_only.writable = False
+    assert client.put("/users/me", json={"first_name": "Z"}).status_code == 200
+
+    response = client.get("/users/me")
+
+    assert response.json()["first_name"] == "Z"
+
+
+def test_read_users_me_skips_snapshot_that_could_not_be_cleared(
+    client, redis_read_only
+):
+    assert client.get("/users/me").status_code == 200
+    redis_read_only.writable = False
+    assert client.delete("/users/me").status_code == 200
+
+    response = client.get("/users/me")
+
+    assert response.status_code == 404